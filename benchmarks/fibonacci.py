@@ -0,0 +1,23 @@
+"""Time FibonacciTool for n up to 10^6.
+
+Usage:
+    python -m benchmarks.fibonacci
+"""
+import timeit
+
+from hodja.tools.math import FibonacciTool, fibonacci
+
+
+if __name__ == "__main__":
+    for exponent in range(1, 7):
+        n = 10 ** exponent
+        seconds = min(timeit.repeat(lambda: fibonacci(n), number=1, repeat=3))
+        print(f"fibonacci(10^{exponent}): {seconds * 1e3:10.3f} ms")
+
+    tool = FibonacciTool(max_n=10 ** 6)
+    ns = list(range(0, 10 ** 6 + 1, 10 ** 4))
+    seconds = min(timeit.repeat(lambda: FibonacciTool(max_n=10 ** 6).run_batch(ns), number=1, repeat=3))
+    print(f"run_batch of {len(ns)} values up to 10^6 (cold cache): {seconds * 1e3:10.3f} ms")
+    tool.run_batch(ns[-128:])
+    seconds = min(timeit.repeat(lambda: tool.run_batch(ns[-128:]), number=1, repeat=3))
+    print(f"run_batch of 128 values up to 10^6 (warm cache): {seconds * 1e3:10.3f} ms")
@@ -0,0 +1,80 @@
+"""Peak memory of ingesting documents into a FAISS vectorstore.
+
+Compares the old storage path, where embeddings came back as lists of Python floats, were
+kept in a list-of-lists document_embeddings and copied with np.array on every FAISS.add,
+with the current path, where float32 arrays are appended straight into the vectorstore buffer.
+
+Usage:
+    python -m benchmarks.ingest_memory [n_documents] [dim]
+"""
+import sys
+import tracemalloc
+
+import faiss
+import numpy as np
+
+from hodja.search.docstores import FAISS
+from hodja.search.documents import Document
+
+
+class ArrayEmbeddings:
+    """Embeddings that return float32 arrays, like a real API response of size dim."""
+
+    def __init__(self, dim):
+        self.dimension = dim
+        self._rng = np.random.default_rng(0)
+
+    def embed(self, texts):
+        return self._rng.random((len(texts), self.dimension), dtype=np.float32)
+
+
+class ListEmbeddings(ArrayEmbeddings):
+    """Embeddings that return lists of Python floats."""
+
+    def embed(self, texts):
+        return super().embed(texts).tolist()
+
+
+class LegacyFAISS:
+    """The storage path of FAISS before embeddings were kept in a float32 buffer."""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.documents = []
+        self.document_embeddings = []
+        self._ids = []
+        self.index = faiss.IndexFlatL2(embeddings.dimension)
+
+    def add(self, documents):
+        for document in documents:
+            if document.id in self._ids:
+                raise ValueError(f"Document with id {document.id} already in vectorstore.")
+            self._ids.append(document.id)
+            self.documents.append(document)
+        texts = [document.text for document in documents]
+        self.document_embeddings.extend(self.embeddings.embed(texts))
+        document_embeddings = self.document_embeddings[-len(documents):]
+        document_embeddings = np.array(document_embeddings, dtype=np.float32)
+        document_embeddings = document_embeddings.reshape(-1, self.embeddings.dimension)
+        self.index.add(document_embeddings)
+
+
+def measure(store, n_documents, batch_size=100):
+    documents = [Document(text=f"document {i}", id=i) for i in range(n_documents)]
+    tracemalloc.start()
+    for i in range(0, n_documents, batch_size):
+        store.add(documents[i:i + batch_size])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == "__main__":
+    n_documents = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 1536
+    for name, store in [
+        ("old (lists)", LegacyFAISS(ListEmbeddings(dim))),
+        ("new (float32 buffer)", FAISS(ArrayEmbeddings(dim))),
+    ]:
+        peak = measure(store, n_documents)
+        print(f"{name:>21}: peak {peak / 2**20:8.1f} MiB for {n_documents} documents of dim {dim}")
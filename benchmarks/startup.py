@@ -0,0 +1,50 @@
+"""Measure the cold import time of hodja modules with ``python -X importtime``.
+
+Exits with a non-zero status if any module takes longer than the budget to import.
+
+Usage:
+    python -m benchmarks.startup [budget_ms]
+"""
+import subprocess
+import sys
+
+MODULES = [
+    "hodja",
+    "hodja.search",
+    "hodja.tools.search_tools",
+    "hodja.tools.chain_tools",
+    "hodja.tools.math",
+    "hodja.links.react",
+]
+DEFAULT_BUDGET_MS = 50
+
+
+def import_time_ms(module, repeat=5):
+    """Return the best cumulative import time of module, in milliseconds, over fresh interpreters."""
+    best = None
+    for _ in range(repeat):
+        stderr = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, check=True,
+        ).stderr
+        # lines look like "import time: self [us] | cumulative | imported package", with
+        # nested imports indented, so sum the top-level hodja packages
+        cumulative = 0
+        for line in stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            _, total, name = line.split("|")
+            if name.startswith(" hodja") and total.strip().isdigit():
+                cumulative += int(total)
+        best = cumulative if best is None else min(best, cumulative)
+    return best / 1000
+
+
+if __name__ == "__main__":
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    over_budget = False
+    for module in MODULES:
+        ms = import_time_ms(module)
+        over_budget |= ms > budget
+        print(f"{module:>26}: {ms:7.1f} ms{'  OVER BUDGET' if ms > budget else ''}")
+    sys.exit(1 if over_budget else 0)
@@ -1,7 +1,6 @@
 """Classes for interacting with OpenAI's API."""
 import os
 from hodja.agents.base import Agent
-import openai
 from collections import defaultdict
 
 # create default dict of context sizes
@@ -51,6 +50,7 @@ class OpenAIAPIAgent(Agent):
                 f"Prompt length ({len(prompt)}) + max_tokens ({self.max_tokens}) "
                 f"exceeds maximum context size ({self.context_size})."
             )
+        import openai
         results = openai.Completion.create(
             prompt=prompt,
             engine=self.engine,
@@ -2,18 +2,26 @@
 
 Chains are the main components of Hodja. They are a collection of Links that are executed in order, with state passing from link to link. Chains are the main way to create a Hodja workflow. The user's input goes into the first Link in the Chain, and the output of the last Link in the Chain is the final output that returns to the user."""
 
+import copy
 from abc import ABC, abstractmethod
 
 
 class Chain(ABC):
-    def __init__(self, name, links=[], intial_state={}):
+    def __init__(self, name, links=[], intial_state=None):
         self.name = name
-        self.state = intial_state
+        # keep a private copy so running the chain never changes the initial state
+        self.initial_state = copy.deepcopy(intial_state) if intial_state is not None else {}
+        self.state = copy.deepcopy(self.initial_state)
         self.links = links
 
     def run(self, input, debug=False):
         """Run the chain by executing each link in order."""
-        self.state["input"] = input
-        for link in self.links:
-            self.state = link.run(self.state, debug=debug)
+        self.state = self.run_state(input, self.state, debug=debug)
         return self.state['output']
+
+    def run_state(self, input, state, debug=False):
+        """Execute each link in order on the given state, without touching the chain's own state. Return the final state."""
+        state["input"] = input
+        for link in self.links:
+            state = link.run(state, debug=debug)
+        return state
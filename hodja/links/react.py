@@ -1,7 +1,6 @@
 """Link implementing ReACT (https://arxiv.org/abs/2210.03629)"""
 from hodja.chains.base import Chain
 from hodja.links.base import Link
-from hodja.agents.openai import OpenAIAPIAgent
 
 REACT_PROMPT = """You are a polite, thoughtful, and resourceful general purpose AI. 
 
@@ -70,8 +69,12 @@ class ReACTLink(Link):
         3. Observation
         
     """
-    def __init__(self, agent=OpenAIAPIAgent(stop=['\n'], max_tokens=250), prompt=REACT_PROMPT, tools=[]):
+    def __init__(self, agent=None, prompt=REACT_PROMPT, tools=[]):
         super().__init__(name="ReACTLink")
+        if agent is None:
+            # default agent is created per instance so importing this module doesn't need openai
+            from hodja.agents.openai import OpenAIAPIAgent
+            agent = OpenAIAPIAgent(stop=['\n'], max_tokens=250)
         self.agent = agent
         self.prompt = prompt
         self.tools = tools
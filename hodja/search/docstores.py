@@ -1,10 +1,8 @@
 """Classes for storing and retrieving documents."""
 import os
 from abc import ABC, abstractmethod
-import faiss
 import pickle
 import json
-import numpy as np
 
 class DocStoreBase(ABC):
 
@@ -86,13 +84,41 @@ class DocStore(DocStoreBase):
 
 
 class VectorStore(DocStoreBase):
-    """A DocStore that embeds documents."""
+    """A DocStore that embeds documents.
+
+    Embeddings are kept as rows of a preallocated float32 buffer that grows geometrically,
+    so adding documents does not re-copy the existing embeddings or box them as Python floats.
+    """
 
     def __init__(self, embeddings):
+        import numpy as np
         self.embeddings = embeddings
         self.documents = []
-        self.document_embeddings = []
         self._ids = []
+        self._embedding_buffer = np.empty((0, 0), dtype=np.float32)
+        self._n_embeddings = 0
+
+    @property
+    def document_embeddings(self):
+        """Embeddings of the documents in the vectorstore as a (n_documents, dim) float32 array view."""
+        return self._embedding_buffer[:self._n_embeddings]
+
+    def _append_embeddings(self, new_embeddings):
+        """Copy new embeddings into the buffer, growing it if needed."""
+        import numpy as np
+        n_new, dim = new_embeddings.shape
+        n_total = self._n_embeddings + n_new
+        buffer = self._embedding_buffer
+        if self._n_embeddings and buffer.shape[1] != dim:
+            raise ValueError(f"Embedding size {dim} does not match vectorstore embedding size {buffer.shape[1]}.")
+        if n_total > buffer.shape[0] or buffer.shape[1] != dim:
+            capacity = max(n_total, 2 * buffer.shape[0], 16)
+            grown = np.empty((capacity, dim), dtype=np.float32)
+            if self._n_embeddings:
+                grown[:self._n_embeddings] = buffer[:self._n_embeddings]
+            self._embedding_buffer = buffer = grown
+        buffer[self._n_embeddings:n_total] = new_embeddings
+        self._n_embeddings = n_total
 
     def add(self, documents):
         """Get embeddings for documents and add to the vectorstore.
@@ -100,20 +126,26 @@ class VectorStore(DocStoreBase):
         Args:
             documents: Documents to add to the vectorstore.
         """
+        import numpy as np
+        # check if documents have ids, if not, assign them via text hash
+        existing_ids = set(self._ids)
+        new_ids = []
         for document in documents:
-            # check if document has an id, if not, assign one via text hash
             if hasattr(document, "id"):
                 # if document has an id, check if it's already in the vectorstore
-                if document.id in self._ids:
+                if document.id in existing_ids:
                     raise ValueError(f"Document with id {document.id} already in vectorstore.")
-                else:
-                    self._ids.append(document.id)
+                new_ids.append(document.id)
             else:
-                self._ids.append(hash(document.text))
-            self.documents.append(document)
+                new_ids.append(hash(document.text))
+            existing_ids.add(new_ids[-1])
+        if not new_ids:
+            return
         texts = [document.text for document in documents]
-        new_document_embeddings = self.embeddings.embed(texts)
-        self.document_embeddings.extend(new_document_embeddings)
+        new_document_embeddings = np.asarray(self.embeddings.embed(texts), dtype=np.float32)
+        self._append_embeddings(new_document_embeddings.reshape(len(texts), -1))
+        self._ids.extend(new_ids)
+        self.documents.extend(documents)
 
     def remove(self, document_ids):
         """Remove documents from the vectorstore.
@@ -121,11 +153,18 @@ class VectorStore(DocStoreBase):
         Args:
             document_ids (list): Document ids to remove from the vectorstore.
         """
-        for document_id in document_ids:
-            index = self._ids.index(document_id)
-            self.documents = self.documents[:index] + self.documents[index+1:]
-            self._ids = self._ids[:index] + self._ids[index+1:]
-            self.document_embeddings = self.document_embeddings[:index] + self.document_embeddings[index+1:]
+        import numpy as np
+        indices = {self._ids.index(document_id) for document_id in document_ids}
+        if not indices:
+            return
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[list(indices)] = False
+        self.documents = [d for d, k in zip(self.documents, keep) if k]
+        self._ids = [i for i, k in zip(self._ids, keep) if k]
+        # compact the remaining embeddings in place
+        n_kept = int(keep[:self._n_embeddings].sum())
+        self._embedding_buffer[:n_kept] = self.document_embeddings[keep[:self._n_embeddings]]
+        self._n_embeddings = n_kept
 
     def get(self, document_id):
         """Get a document from the vectorstore.
@@ -146,10 +185,15 @@ class VectorStore(DocStoreBase):
 
 
 class FAISS(VectorStore):
-    """Vector database that uses FAISS for fast semantic similarity search over documents."""
+    """Vector database that uses FAISS for fast semantic similarity search over documents.
+
+    faiss is imported on first use, so importing this module does not require it.
+    """
 
     def __init__(self, embeddings, index=None, documents=None):
+        import faiss
         super().__init__(embeddings)
+        self._dimension = None
         if index is None:
             self.index = faiss.IndexFlatL2(self._embedding_size)
         else:
@@ -161,10 +205,13 @@ class FAISS(VectorStore):
 
     @property
     def _embedding_size(self):
-        return len(self.embeddings.embed(["dummy"])[0])
+        if self._dimension is None:
+            self._dimension = getattr(self.embeddings, "dimension", None) or len(self.embeddings.embed(["dummy"])[0])
+        return self._dimension
         
     def save( self, save_directory):
         """Save to files."""
+        import faiss
         faiss.write_index(self.index, "index.faiss")
         with open(os.path.join(save_directory, "documents.json"), "w") as f:
             json.dump(self.documents, f)
@@ -174,6 +221,7 @@ class FAISS(VectorStore):
     @classmethod
     def load(cls, save_directory):
         """Load from files."""
+        import faiss
         index = faiss.read_index("index.faiss")
         with open(os.path.join(save_directory, "documents.json"), "r") as f:
             documents = json.load(f)
@@ -191,11 +239,12 @@ class FAISS(VectorStore):
         Args:
             document: Document to add to the vectorstore.
         """
+        n_before = self._n_embeddings
         super().add(documents)
-        document_embeddings = self.document_embeddings[-len(documents):]
-        document_embeddings = np.array(document_embeddings, dtype=np.float32)
-        document_embeddings = document_embeddings.reshape(-1, self._embedding_size)
-        self.index.add(document_embeddings)
+        # contiguous float32 view into the buffer, so faiss can read it without a copy
+        document_embeddings = self.document_embeddings[n_before:]
+        if len(document_embeddings):
+            self.index.add(document_embeddings)
 
     def remove(self, document_ids):
         """Remove documents from the vectorstore.
@@ -203,17 +252,73 @@ class FAISS(VectorStore):
         Args:
             document_ids (list): Document ids to remove from the vectorstore.
         """
+        import faiss
         super().remove(document_ids)
         self.index = faiss.IndexFlatL2(self._embedding_size)
-        self.document_embeddings = np.array(self.document_embeddings, dtype=np.float32)
         if len(self.document_embeddings):
             self.index.add(self.document_embeddings)
 
+    def embed_query(self, query):
+        """Embed a query as a float32 vector."""
+        import numpy as np
+        return np.asarray(self.embeddings.embed([query]), dtype=np.float32).reshape(-1)
+
+    def search_by_vector(self, query_embedding, k=4):
+        """Return the squared L2 distances and positions of the k documents nearest to an embedding.
+
+        Args:
+            query_embedding: Embedding to search for.
+            k: Number of nearest documents to return.
+
+        Returns:
+            Tuple of (distances, indices) arrays, nearest first. Indices are positions in
+            self.documents and self.document_embeddings.
+        """
+        import numpy as np
+        k = min(k, self.index.ntotal)
+        if k <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        D, I = self.index.search(query_embedding.reshape(1, -1), k)
+        # faiss pads with -1 when there are fewer than k documents
+        found = I[0] >= 0
+        return D[0][found], I[0][found]
+
+    def get_embeddings(self, indices):
+        """Get the embeddings of the documents at the given positions.
+
+        Falls back to reconstructing them from the index when the vectorstore was built
+        from an existing index and does not hold the embeddings itself.
+
+        Args:
+            indices: Positions in self.documents.
+
+        Returns:
+            float32 array of shape (len(indices), dim).
+        """
+        import numpy as np
+        indices = np.asarray(indices, dtype=np.int64)
+        if self._n_embeddings == self.index.ntotal:
+            return self.document_embeddings[indices]
+        if len(indices) == 0:
+            return np.empty((0, self.index.d), dtype=np.float32)
+        return self.index.reconstruct_batch(indices)
+
+    def search_candidates(self, query_embedding, k=4):
+        """Return the k documents nearest to an embedding along with their distances and embeddings.
+
+        Args:
+            query_embedding: Embedding to search for.
+            k: Number of nearest documents to return.
+
+        Returns:
+            Tuple of (squared L2 distances, documents, embeddings), nearest first.
+        """
+        distances, indices = self.search_by_vector(query_embedding, k)
+        return distances, [self.documents[i] for i in indices], self.get_embeddings(indices)
+
     def search(self, query, k=4):
         """Return docs most similar to query."""
-        query_embedding = self.embeddings.embed([query])[0]
-        query_embedding = np.array(query_embedding, dtype=np.float32)
-        D, I = self.index.search(query_embedding.reshape(1, -1), k)
-        return [self.documents[i] for i in I[0]]
+        _, indices = self.search_by_vector(self.embed_query(query), k)
+        return [self.documents[i] for i in indices]
 
 
@@ -1,11 +1,14 @@
 """Interface for embedding models."""
 from abc import ABC, abstractmethod
-import numpy as np
 
 class Embeddings(ABC):
     """Interface for embeddings."""
 
     @abstractmethod
     def embed(self, documents, **kwargs):
-        """Embed documents."""
+        """Embed documents.
+
+        Returns:
+            C-contiguous float32 array of shape (len(documents), dim), one row for each document.
+        """
         raise NotImplementedError
\ No newline at end of file
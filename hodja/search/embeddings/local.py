@@ -0,0 +1,112 @@
+"""Embedding models that run locally on the CPU."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from hodja.search.embeddings.base import Embeddings
+
+# constants for the polynomial rolling hash and the final bit mixer (splitmix64)
+_HASH_BASE = np.uint64(1099511628211)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_NGRAM_SEED = 0x9E3779B97F4A7C15
+
+
+def _mix(h):
+    """Scramble the bits of an array of uint64 hashes."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * _MIX_1
+    h = h ^ (h >> np.uint64(27))
+    h = h * _MIX_2
+    return h ^ (h >> np.uint64(31))
+
+
+class HashingEmbeddings(Embeddings):
+    """Embeddings computed in-process by hashing character n-grams into a fixed number of buckets.
+
+    No model weights or network access are needed, which makes this backend usable in
+    air-gapped deployments. Similar texts share many n-grams and so end up close together
+    in the embedding space.
+    """
+
+    def __init__(self, dimension=1024, ngram_range=(3, 5), lowercase=True, batch_size=256, n_jobs=None):
+        """Initialize HashingEmbeddings.
+
+        Args:
+            dimension (int): Size of the embedding vectors (number of hash buckets).
+            ngram_range (tuple): Smallest and largest character n-gram size to hash.
+            lowercase (bool): Lowercase texts before hashing.
+            batch_size (int): Number of texts embedded together in one vectorized pass.
+            n_jobs (int): Number of threads used to embed batches in parallel. Defaults to
+                the number of CPUs.
+        """
+        if dimension < 1:
+            raise ValueError("dimension must be at least 1.")
+        if ngram_range[0] < 1 or ngram_range[0] > ngram_range[1]:
+            raise ValueError(f"Invalid ngram_range {ngram_range}.")
+        self.dimension = dimension
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+
+    def _embed_batch(self, texts, out):
+        """Embed a batch of texts into the rows of out."""
+        if self.lowercase:
+            texts = [text.lower() for text in texts]
+        encoded = [f" {text} ".encode("utf-8") for text in texts]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        doc_ids = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+        counts = np.zeros(len(texts) * self.dimension, dtype=np.float64)
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            n_starts = len(buffer) - n + 1
+            if n_starts <= 0:
+                continue
+            # rolling hash of every n-gram in the batch at once
+            h = buffer[:n_starts].copy()
+            for j in range(1, n):
+                h *= _HASH_BASE
+                h += buffer[j:j + n_starts]
+            h = _mix(h ^ np.uint64((_NGRAM_SEED * n) & 0xFFFFFFFFFFFFFFFF))
+            # drop n-grams that span two texts
+            valid = doc_ids[:n_starts] == doc_ids[n - 1:]
+            h = h[valid]
+            buckets = (h >> np.uint64(32)) % np.uint64(self.dimension)
+            signs = 1.0 - 2.0 * (h & np.uint64(1)).astype(np.float64)
+            counts += np.bincount(
+                doc_ids[:n_starts][valid] * self.dimension + buckets.astype(np.int64),
+                weights=signs,
+                minlength=len(counts),
+            )
+
+        vectors = counts.reshape(len(texts), self.dimension)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        np.divide(vectors, norms, out=out, casting="unsafe")
+
+    def embed(self, texts, batch_size=None):
+        """Embed texts locally.
+
+        Args:
+            texts (List[str]): The texts to embed.
+            batch_size (int): The maximum number of texts to embed in one vectorized pass.
+                Defaults to the batch_size given at initialization.
+
+        Returns:
+            C-contiguous float32 array of shape (len(texts), dimension) with L2-normalized rows.
+        """
+        batch_size = batch_size or self.batch_size
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        batches = [(i, texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        if len(batches) <= 1 or self.n_jobs == 1:
+            for i, batch in batches:
+                self._embed_batch(batch, embeddings[i:i + len(batch)])
+        else:
+            # numpy releases the GIL in its heavy loops, so threads use multiple cores
+            with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+                list(executor.map(
+                    lambda args: self._embed_batch(args[1], embeddings[args[0]:args[0] + len(args[1])]),
+                    batches,
+                ))
+        return embeddings
@@ -1,8 +1,6 @@
 """Wrapper around OpenAI embedding models."""
 import os
-import numpy as np
 from hodja.search.embeddings.base import Embeddings
-import openai
 
 class OpenAIEmbeddings(Embeddings):
     """Wrapper around OpenAI embedding models."""
@@ -23,6 +21,7 @@ class OpenAIEmbeddings(Embeddings):
             openai_api_key = os.environ.get("OPENAI_API_KEY")
         self.openai_api_key = openai_api_key
         self.model_name = model_name
+        import openai
         self.client = openai.Embedding
 
     def embed(self, texts, batch_size=1000):
@@ -33,12 +32,18 @@ class OpenAIEmbeddings(Embeddings):
             batch_size (int): The maximum number of documents to send to OpenAI at once.
 
         Returns:
-            List of embeddings, one for each document.
+            float32 array of shape (len(texts), dim), one row for each document.
         """
-        results = []
+        import numpy as np
+        results = None
         for i in range(0, len(texts), batch_size):
             response = self.client.create(
                 input=texts[i : i + batch_size], engine=self.model_name
             )
-            results += [r["embedding"] for r in response["data"]]
+            batch = np.array([r["embedding"] for r in response["data"]], dtype=np.float32)
+            if results is None:
+                results = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+            results[i : i + len(batch)] = batch
+        if results is None:
+            results = np.empty((0, 0), dtype=np.float32)
         return results
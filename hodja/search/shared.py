@@ -0,0 +1,387 @@
+"""Serve a read-only snapshot of a DocStore to several processes through shared memory.
+
+One process publishes a frozen copy of a DocStore or VectorStore with a
+SharedDocStorePublisher. Worker processes open a SharedDocStore by name and search it
+without copying the documents or embeddings into their own memory:
+
+    # publisher
+    publisher = SharedDocStorePublisher(store, name="docs")
+    ...
+    publisher.publish(updated_store)  # atomically swap in a new snapshot
+
+    # workers
+    docstore = SharedDocStore("docs", embeddings)
+    docstore.search("query")
+
+Each snapshot lives in its own shared memory block holding the document texts as one packed
+UTF-8 buffer plus offsets, the other document attributes as packed pickles plus offsets, and
+the embeddings as a (n_documents, dim) float32 array. A small control block holds the name of
+the current snapshot, so workers pick up a new snapshot on their next call.
+"""
+import pickle
+import struct
+import sys
+import threading
+import time
+import weakref
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from hodja.search.docstores import DocStoreBase
+from hodja.search.documents import Document
+
+_CONTROL_SIZE = 256
+_HEADER_SIZE = 64
+
+# names of the shared memory blocks created by this process
+_created_names = set()
+
+# (weakref to embeddings, block) of collected snapshots whose embeddings callers still hold
+_pending_unmaps = []
+_pending_unmaps_lock = threading.RLock()
+
+
+def _attach(name):
+    """Attach to an existing shared memory block without handing it to this process's resource tracker.
+
+    Otherwise the tracker would unlink the block when this (worker) process exits.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    shm = SharedMemory(name=name)
+    if shm._name not in _created_names:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _create(size, name=None):
+    shm = SharedMemory(name=name, create=True, size=size)
+    _created_names.add(shm._name)
+    return shm
+
+
+def _write_snapshot(store):
+    """Copy the documents and embeddings of a store into a new shared memory block."""
+    import numpy as np
+    documents = list(store.get_all())
+    if hasattr(store, "_ids"):
+        ids = list(store._ids)
+        if len(ids) != len(documents):
+            # stores built from an existing index (e.g. FAISS.load) don't track ids
+            ids = [getattr(document, "id", hash(document.text)) for document in documents]
+        if hasattr(store, "get_embeddings"):
+            embeddings = store.get_embeddings(range(len(documents)))
+        else:
+            embeddings = store.document_embeddings
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    else:
+        ids = list(store.documents.keys())
+        embeddings = np.empty((len(documents), 0), dtype=np.float32)
+    n, dim = len(documents), embeddings.shape[1] if len(embeddings) else 0
+
+    texts = [document.text.encode("utf-8") for document in documents]
+    metadata = [pickle.dumps({k: v for k, v in document.__dict__.items() if k != "text"}) for document in documents]
+    text_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in texts], out=text_offsets[1:])
+    metadata_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(m) for m in metadata], out=metadata_offsets[1:])
+    texts, metadata, ids = b"".join(texts), b"".join(metadata), pickle.dumps(ids)
+
+    sizes = [16 * (n + 1), 4 * n * dim, len(texts), len(metadata), len(ids)]
+    shm = _create(_HEADER_SIZE + sum(sizes))
+    struct.pack_into("5q", shm.buf, 0, n, dim, len(texts), len(metadata), len(ids))
+    position = _HEADER_SIZE
+    for array in (text_offsets, metadata_offsets, embeddings.reshape(-1)):
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=position)
+        view[:] = array
+        del view
+        position += array.nbytes
+    for blob in (texts, metadata, ids):
+        shm.buf[position:position + len(blob)] = blob
+        position += len(blob)
+    return shm
+
+
+def _unmap_unused():
+    """Unmap the blocks of collected snapshots once nothing holds their embeddings any more."""
+    with _pending_unmaps_lock:
+        still_used = []
+        for embeddings, shm in _pending_unmaps:
+            if embeddings() is None:
+                shm.close()
+            else:
+                still_used.append((embeddings, shm))
+        _pending_unmaps[:] = still_used
+
+
+def _read_control(control):
+    """Return (generation, snapshot name) from the control block, waiting out concurrent swaps."""
+    while True:
+        generation, length = struct.unpack_from("2q", control.buf, 0)
+        if generation % 2 == 0:
+            name = bytes(control.buf[16:16 + length]).decode("ascii")
+            if struct.unpack_from("q", control.buf, 0)[0] == generation:
+                return generation, name
+        time.sleep(0)
+
+
+class SharedDocStorePublisher:
+    """Publishes read-only snapshots of a DocStore into shared memory for SharedDocStore readers."""
+
+    def __init__(self, store, name=None):
+        """Publish the first snapshot of store.
+
+        Args:
+            store: DocStore, VectorStore or FAISS store to publish.
+            name: Name of the shared memory control block that readers open. Chosen at random if not given.
+        """
+        self._control = _create(_CONTROL_SIZE, name=name)
+        struct.pack_into("2q", self._control.buf, 0, 0, 0)
+        self._snapshot = None
+        self.publish(store)
+
+    @property
+    def name(self):
+        """Name that readers pass to SharedDocStore."""
+        return self._control.name
+
+    def publish(self, store):
+        """Publish a new snapshot of store and atomically make it the current one."""
+        snapshot = _write_snapshot(store)
+        name = snapshot.name.encode("ascii")
+        generation = struct.unpack_from("q", self._control.buf, 0)[0]
+        # odd generations mark a swap in progress
+        struct.pack_into("q", self._control.buf, 0, generation + 1)
+        struct.pack_into("q", self._control.buf, 8, len(name))
+        self._control.buf[16:16 + len(name)] = name
+        struct.pack_into("q", self._control.buf, 0, generation + 2)
+        # readers still using the old snapshot keep their mapping after the unlink
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot.unlink()
+        self._snapshot = snapshot
+
+    def close(self):
+        """Remove the published snapshot and the control block."""
+        for shm in (self._snapshot, self._control):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _Snapshot:
+    """Zero-copy views into a published snapshot.
+
+    The block stays mapped while the snapshot is referenced (by a SharedDocStore, a call in
+    progress or a documents sequence) and, after that, while the embeddings array it handed
+    out (or any view of it) is still alive. Only then is it unmapped.
+    """
+
+    def __init__(self, shm):
+        import numpy as np
+        self.shm = shm
+        n, dim, n_text, n_metadata, n_ids = struct.unpack_from("5q", shm.buf, 0)
+        position = _HEADER_SIZE
+        self.text_offsets = np.ndarray((n + 1,), dtype=np.int64, buffer=shm.buf, offset=position)
+        position += 8 * (n + 1)
+        self.metadata_offsets = np.ndarray((n + 1,), dtype=np.int64, buffer=shm.buf, offset=position)
+        position += 8 * (n + 1)
+        self.embeddings = np.ndarray((n, dim), dtype=np.float32, buffer=shm.buf, offset=position)
+        self.embeddings.flags.writeable = False
+        position += 4 * n * dim
+        self.texts = shm.buf[position:position + n_text]
+        position += n_text
+        self.metadata = shm.buf[position:position + n_metadata]
+        position += n_metadata
+        self.ids = pickle.loads(shm.buf[position:position + n_ids])
+        self._positions = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def document(self, i):
+        text = bytes(self.texts[self.text_offsets[i]:self.text_offsets[i + 1]]).decode("utf-8")
+        metadata = pickle.loads(self.metadata[self.metadata_offsets[i]:self.metadata_offsets[i + 1]])
+        return Document(text, **metadata)
+
+    def position(self, document_id):
+        if self._positions is None:
+            self._positions = {document_id: i for i, document_id in enumerate(self.ids)}
+        return self._positions[document_id]
+
+    def __del__(self):
+        # nothing refers to the snapshot any more, but callers may still hold its embeddings;
+        # numpy arrays keep the mmap object alive but not mapped, so defer unmapping until they are gone
+        for view in (self.texts, self.metadata):
+            view.release()
+        embeddings = weakref.ref(self.embeddings)
+        self.text_offsets = self.metadata_offsets = self.embeddings = None
+        with _pending_unmaps_lock:
+            _pending_unmaps.append((embeddings, self.shm))
+        _unmap_unused()
+
+
+class _SnapshotDocuments:
+    """Read-only sequence of the documents in a snapshot, decoded on access."""
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._snapshot.document(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("document index out of range")
+        return self._snapshot.document(i)
+
+    def __iter__(self):
+        return (self._snapshot.document(i) for i in range(len(self)))
+
+
+class SharedDocStore(DocStoreBase):
+    """Read-only DocStore that serves a snapshot published by a SharedDocStorePublisher.
+
+    Offers the same search API as FAISS, with exact L2 search directly over the shared
+    embeddings, so it can be wrapped in a SearchTool. A newly published snapshot is picked
+    up on the next call to refresh, search, search_by_vector, search_candidates, get, get_all
+    or len. Each of these calls works on a single snapshot, so use search_candidates rather
+    than search_by_vector followed by documents when other threads may refresh the store.
+    Documents sequences and embeddings obtained earlier stay valid after a swap.
+    """
+
+    def __init__(self, name, embeddings=None):
+        """Open a published docstore.
+
+        Args:
+            name: Name of the publisher's control block.
+            embeddings: Embeddings used to embed queries. Required for search.
+        """
+        self.embeddings = embeddings
+        self._control = _attach(name)
+        self._lock = threading.Lock()
+        self._generation = None
+        self._snapshot = None
+        self.refresh()
+
+    def refresh(self):
+        """Switch to the current snapshot if a new one has been published. Returns the current snapshot."""
+        with self._lock:
+            while True:
+                generation, name = _read_control(self._control)
+                if generation == self._generation:
+                    return self._snapshot
+                try:
+                    shm = _attach(name)
+                except FileNotFoundError:
+                    # the snapshot was replaced between reading its name and attaching
+                    continue
+                break
+            # the old snapshot is unmapped once nothing uses it any more
+            self._snapshot = _Snapshot(shm)
+            self._generation = generation
+            snapshot = self._snapshot
+        _unmap_unused()
+        return snapshot
+
+    @property
+    def documents(self):
+        """Documents of the current snapshot."""
+        return _SnapshotDocuments(self._snapshot)
+
+    @property
+    def document_embeddings(self):
+        """Embeddings of the current snapshot as a read-only view of shared memory."""
+        return self._snapshot.embeddings
+
+    def add(self, documents):
+        raise TypeError("SharedDocStore is read-only. Publish a new snapshot instead.")
+
+    def remove(self, document_ids):
+        raise TypeError("SharedDocStore is read-only. Publish a new snapshot instead.")
+
+    def get(self, document_id):
+        """Get a document from the store.
+
+        Args:
+            document_id: Document id to get from the store.
+        """
+        snapshot = self.refresh()
+        return snapshot.document(snapshot.position(document_id))
+
+    def get_all(self):
+        """Get all documents from the store."""
+        return list(_SnapshotDocuments(self.refresh()))
+
+    def __len__(self):
+        """Get the number of documents in the store."""
+        return len(self.refresh())
+
+    def embed_query(self, query):
+        """Embed a query as a float32 vector."""
+        import numpy as np
+        return np.asarray(self.embeddings.embed([query]), dtype=np.float32).reshape(-1)
+
+    def _search(self, snapshot, query_embedding, k):
+        import faiss
+        import numpy as np
+        embeddings = snapshot.embeddings
+        k = min(k, len(embeddings))
+        if k <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        if embeddings.shape[1] == 0:
+            raise ValueError("The published store has no embeddings to search.")
+        D, I = faiss.knn(query_embedding.reshape(1, -1), embeddings, k)
+        return D[0], I[0]
+
+    def search_by_vector(self, query_embedding, k=4):
+        """Return the squared L2 distances and positions of the k documents nearest to an embedding.
+
+        Args:
+            query_embedding: Embedding to search for.
+            k: Number of nearest documents to return.
+
+        Returns:
+            Tuple of (distances, indices) arrays, nearest first. Indices are positions in
+            self.documents and self.document_embeddings.
+        """
+        return self._search(self.refresh(), query_embedding, k)
+
+    def get_embeddings(self, indices):
+        """Get the embeddings of the documents at the given positions as a float32 array."""
+        return self._snapshot.embeddings[indices]
+
+    def search_candidates(self, query_embedding, k=4):
+        """Return the k documents nearest to an embedding, all from the same snapshot.
+
+        Args:
+            query_embedding: Embedding to search for.
+            k: Number of nearest documents to return.
+
+        Returns:
+            Tuple of (squared L2 distances, documents, embeddings), nearest first.
+        """
+        snapshot = self.refresh()
+        distances, indices = self._search(snapshot, query_embedding, k)
+        return distances, [snapshot.document(i) for i in indices], snapshot.embeddings[indices]
+
+    def search(self, query, k=4):
+        """Return docs most similar to query."""
+        query_embedding = self.embed_query(query)
+        snapshot = self.refresh()
+        _, indices = self._search(snapshot, query_embedding, k)
+        return [snapshot.document(i) for i in indices]
+
+    def close(self):
+        """Detach from shared memory. Embeddings still held by callers stay mapped until they are released."""
+        self._snapshot = None
+        _unmap_unused()
+        self._control.close()
@@ -0,0 +1,140 @@
+"""Unit tests for chain_tools.py"""
+
+import threading
+import time
+import unittest
+from hodja.chains import Chain
+from hodja.links.base import Link
+from hodja.tools.chain_tools import ChainTool
+
+
+class UpperLink(Link):
+    """Link that uppercases the input and counts how often it runs."""
+
+    def __init__(self, delay=0.0):
+        super().__init__(name="UpperLink")
+        self.calls = 0
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def validate_state(self, state):
+        return True
+
+    def run(self, state, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        state.setdefault("seen", []).append(state["input"])
+        state["output"] = state["input"].upper()
+        with self._lock:
+            self.running -= 1
+        return state
+
+
+class RecordLink(Link):
+    """Link that records the "seen" list of the state it receives."""
+
+    def __init__(self, records):
+        super().__init__(name="RecordLink")
+        self.records = records
+
+    def validate_state(self, state):
+        return True
+
+    def run(self, state, **kwargs):
+        self.records.append(list(state["seen"]))
+        return state
+
+
+class CountdownLink(Link):
+    """Link that calls a tool on input - 1 until it reaches 0."""
+
+    def __init__(self):
+        super().__init__(name="CountdownLink")
+        self.tool = None
+
+    def validate_state(self, state):
+        return True
+
+    def run(self, state, **kwargs):
+        n = int(state["input"])
+        state["output"] = "0" if n == 0 else f"{n} {self.tool.run(str(n - 1))}"
+        return state
+
+
+class TestChainTool(unittest.TestCase):
+
+    def test_run(self):
+        """Test that the tool returns the chain output with isolated state."""
+        link = UpperLink()
+        chain = Chain("Upper", links=[link], intial_state={"seen": []})
+        tool = ChainTool(chain, cache_size=0)
+        self.assertEqual(tool.name, "Upper")
+        self.assertEqual(tool.run("a"), "A")
+        self.assertEqual(tool.run("b"), "B")
+        self.assertEqual(chain.initial_state, {"seen": []})
+        self.assertEqual(link.calls, 2)
+
+    def test_isolated_from_chain_run(self):
+        """Test that running the chain directly does not leak state into tool calls."""
+        chain = Chain("Upper", links=[UpperLink()], intial_state={"seen": []})
+        tool = ChainTool(chain, cache_size=0)
+        chain.run("direct")
+        outputs = []
+        chain.links = [UpperLink(), RecordLink(outputs)]
+        tool.run("tool")
+        self.assertEqual(outputs, [["tool"]])
+        self.assertEqual(chain.initial_state, {"seen": []})
+        self.assertIsNot(Chain("a").initial_state, Chain("b").initial_state)
+
+    def test_cache(self):
+        """Test that repeated inputs are served from the cache."""
+        link = UpperLink()
+        tool = ChainTool(Chain("Upper", links=[link]), cache_size=1)
+        tool.run("a")
+        tool.run("a")
+        self.assertEqual(link.calls, 1)
+        tool.run("b")
+        tool.run("a")
+        self.assertEqual(link.calls, 3)
+
+    def test_ttl(self):
+        """Test that cached outputs expire."""
+        link = UpperLink()
+        tool = ChainTool(Chain("Upper", links=[link]), ttl=0.01)
+        tool.run("a")
+        time.sleep(0.02)
+        tool.run("a")
+        self.assertEqual(link.calls, 2)
+
+    def test_max_concurrency(self):
+        """Test that concurrent chain executions are limited."""
+        link = UpperLink(delay=0.02)
+        tool = ChainTool(Chain("Upper", links=[link]), max_concurrency=2)
+        threads = [threading.Thread(target=tool.run, args=(str(i),)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(link.calls, 6)
+        self.assertLessEqual(link.max_running, 2)
+
+    def test_recursion(self):
+        """Test that a chain calling its own tool deeper than max_concurrency does not deadlock."""
+        link = CountdownLink()
+        tool = ChainTool(Chain("Countdown", links=[link]), max_concurrency=2)
+        link.tool = tool
+        outputs = []
+        thread = threading.Thread(target=lambda: outputs.append(tool.run("3")), daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(outputs, ["3 2 1 0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
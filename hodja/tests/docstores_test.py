@@ -2,6 +2,8 @@
 
 import unittest
 
+import numpy as np
+
 from hodja.search import docstores
 from hodja.search.documents import Document
 
@@ -100,5 +102,20 @@ class TestFAISS(unittest.TestCase):
         store.add(documents)
         self.assertEqual(store.search(document3.text, 1), [document3])
 
+    def test_document_embeddings(self):
+        """Test that embeddings are kept in a contiguous float32 buffer."""
+        store = docstores.FAISS(DummyEmbeddings())
+        documents = [Document(text=f"test{i}", id=i) for i in range(40)]
+        store.add(documents[:20])
+        store.add(documents[20:])
+        store.remove([3, 13])
+        embeddings = store.document_embeddings
+        self.assertEqual(embeddings.dtype, np.float32)
+        self.assertEqual(embeddings.shape, (38, 3))
+        self.assertTrue(embeddings.flags["C_CONTIGUOUS"])
+        self.assertEqual(embeddings[3].tolist(), [1, 1, 1])
+        self.assertEqual(embeddings[21].tolist(), [0, 0, 0])
+        self.assertEqual(store.index.ntotal, 38)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""Unit tests for the embeddings modules."""
+
+import unittest
+
+import numpy as np
+
+from hodja.search.embeddings.local import HashingEmbeddings
+
+
+class TestHashingEmbeddings(unittest.TestCase):
+    """Unit tests for the HashingEmbeddings class."""
+
+    def test_embed(self):
+        """Test that embed returns normalized float32 arrays."""
+        embeddings = HashingEmbeddings(dimension=64)
+        vectors = embeddings.embed(["hello world", "goodbye world", ""])
+        self.assertIsInstance(vectors, np.ndarray)
+        self.assertEqual(vectors.dtype, np.float32)
+        self.assertEqual(vectors.shape, (3, 64))
+        self.assertTrue(vectors.flags["C_CONTIGUOUS"])
+        np.testing.assert_allclose(np.linalg.norm(vectors[:2], axis=1), [1, 1], rtol=1e-5)
+
+    def test_empty_input(self):
+        """Test that embedding no texts returns an empty array."""
+        embeddings = HashingEmbeddings(dimension=8)
+        self.assertEqual(embeddings.embed([]).shape, (0, 8))
+
+    def test_deterministic_across_batches(self):
+        """Test that batching and threading do not change the embeddings."""
+        texts = [f"document number {i}" for i in range(50)]
+        single = HashingEmbeddings(dimension=32, batch_size=1000, n_jobs=1).embed(texts)
+        batched = HashingEmbeddings(dimension=32, batch_size=7, n_jobs=4).embed(texts)
+        np.testing.assert_array_equal(single, batched)
+
+    def test_similarity(self):
+        """Test that similar texts are closer than unrelated texts."""
+        embeddings = HashingEmbeddings()
+        a, b, c = embeddings.embed(["the cat sat on the mat", "the cat sat on a mat", "quantum chromodynamics"])
+        self.assertGreater(a @ b, a @ c)
+
+
+if __name__ == "__main__":
+    unittest.main()
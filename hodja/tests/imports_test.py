@@ -0,0 +1,40 @@
+"""Unit tests checking that importing hodja does not load heavy optional dependencies."""
+
+import subprocess
+import sys
+import unittest
+
+HEAVY_MODULES = ["faiss", "numpy", "openai"]
+
+
+def loaded_heavy_modules(module):
+    """Import module in a fresh interpreter and return the heavy modules it loaded."""
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return output.split()
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_lazy_imports(self):
+        """Test that heavy dependencies are only imported on first use."""
+        for module in [
+            "hodja",
+            "hodja.search",
+            "hodja.tools.search_tools",
+            "hodja.tools.chain_tools",
+            "hodja.tools.math",
+            "hodja.links.react",
+            "hodja.agents.openai",
+            "hodja.search.embeddings.openai",
+        ]:
+            self.assertEqual(loaded_heavy_modules(module), [], module)
+
+    def test_react_link_default_agent(self):
+        """Test that each ReACTLink gets its own default agent."""
+        from hodja.links.react import ReACTLink
+        self.assertIsNot(ReACTLink().agent, ReACTLink().agent)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Unit tests for math.py"""
+
+import unittest
+from hodja.tools.math import FibonacciTool, MathTool, fibonacci
+
+
+class TestMathTool(unittest.TestCase):
+
+    def test_run(self):
+        """Test the run method."""
+        tool = MathTool()
+        self.assertEqual(tool.run("1+2*3"), 7)
+        self.assertEqual(tool.run("-(1 + 2) * 3"), -9)
+        self.assertEqual(tool.run("7/2"), 3.5)
+        self.assertEqual(tool.run("1,2+3"), (1, 5))
+
+    def test_batch(self):
+        """Test evaluating several expressions at once."""
+        tool = MathTool()
+        self.assertEqual(tool.run("1+1; 2*3;"), [2, 6])
+        self.assertEqual(tool.run_batch(["2**10", "10 % 3"]), [1024, 1])
+        self.assertEqual(tool.run("1;"), [1])
+        with self.assertRaises(ValueError):
+            tool.run_batch(["1", "", "2"])
+        with self.assertRaises(ValueError):
+            tool.run("1;;2")
+
+    def test_invalid_input(self):
+        """Test that anything but arithmetic is rejected."""
+        tool = MathTool()
+        for expression in ["__import__('os')", "x + 1", "[1, 2]", "1 +", "True + 1", "(-2)**0.5", "1j"]:
+            with self.assertRaises(ValueError):
+                tool.run(expression)
+
+    def test_limits(self):
+        """Test that huge computations are refused."""
+        tool = MathTool(max_bits=64, max_operations=3)
+        for expression in ["9**9**9", "99999999999*99999999999", "2**65", "1+1+1+1+1", "1/0", "2.0**100000"]:
+            with self.assertRaises(ValueError):
+                tool.run(expression)
+        self.assertEqual(tool.run("2**63"), 2 ** 63)
+
+    def test_cache(self):
+        """Test that expressions are compiled only once."""
+        tool = MathTool()
+        tool.run("1+2")
+        tool.run("1+2")
+        self.assertEqual(tool._cached_compile.cache_info().hits, 1)
+
+
+class TestFibonacci(unittest.TestCase):
+
+    def test_fibonacci(self):
+        """Test the fibonacci function against the iterative definition."""
+        a, b = 0, 1
+        for n in range(300):
+            self.assertEqual(fibonacci(n), a)
+            a, b = b, a + b
+
+    def test_negative(self):
+        """Test that negative n raises an error."""
+        with self.assertRaises(ValueError):
+            fibonacci(-1)
+
+
+class TestFibonacciTool(unittest.TestCase):
+
+    def test_run(self):
+        """Test the run method."""
+        tool = FibonacciTool()
+        self.assertEqual(tool.run("0"), 1)
+        self.assertEqual(tool.run("1"), 1)
+        self.assertEqual(tool.run("10"), 89)
+        self.assertEqual(tool.run(5000), fibonacci(5001))
+
+    def test_invalid_input(self):
+        """Test that invalid inputs raise errors."""
+        tool = FibonacciTool(max_n=100)
+        for n in ["abc", None, -1, 101]:
+            with self.assertRaises(ValueError):
+                tool.run(n)
+
+    def test_run_batch(self):
+        """Test the run_batch method."""
+        tool = FibonacciTool()
+        self.assertEqual(tool.run_batch(["10", 3, 10]), [89, 3, 89])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,11 @@
 """Unit tests for search_tools.py"""
 
 import unittest
+
+import numpy as np
 from hodja.search.docstores import FAISS
-from hodja.tools.search_tools import SearchTool
+from hodja.tools.search_tools import SearchTool, maximal_marginal_relevance
+from hodja.search.embeddings.local import HashingEmbeddings
 from hodja.tests.docstores_test import DummyEmbeddings
 from hodja.search.documents import Document
 
@@ -30,6 +33,90 @@ class TestSearchTool(unittest.TestCase):
         search_tool.add_docs([document])
         self.assertEqual(search_tool.docstore.documents, [document])
 
+    def test_max_distance(self):
+        """Test that documents far from the query are dropped."""
+        search_tool = SearchTool(FAISS(HashingEmbeddings()), max_distance=0.5)
+        close = Document(text="the cat sat on the mat", id=1)
+        far = Document(text="quantum chromodynamics", id=2)
+        search_tool.add_docs([close, far])
+        self.assertEqual(search_tool.run("the cat sat on the mat", top_k=2), [close])
+
+    def test_max_distance_is_not_squared(self):
+        """Test that max_distance is compared against the L2 distance, not its square."""
+        # the embeddings are [1, 1, 1] and [0, 0, 0], which are sqrt(3) apart
+        document1 = Document(text="test1", id=1)
+        document3 = Document(text="test3", id=3)
+        search_tool = SearchTool(FAISS(DummyEmbeddings()), max_distance=1.8)
+        search_tool.add_docs([document1, document3])
+        self.assertEqual(search_tool.run("test3", top_k=2), [document3, document1])
+        search_tool.max_distance = 1.7
+        self.assertEqual(search_tool.run("test3", top_k=2), [document3])
+
+    def test_mmr(self):
+        """Test that near-duplicate documents are not both returned."""
+        search_tool = SearchTool(FAISS(HashingEmbeddings()), mmr_lambda=0.5)
+        original = Document(text="the cat sat on the mat", id=1)
+        duplicate = Document(text="the cat sat on the mat!", id=2)
+        other = Document(text="a cat chased the dog", id=3)
+        search_tool.add_docs([original, duplicate, other])
+        self.assertEqual(search_tool.run("the cat sat on the mat", top_k=2), [original, other])
+
+    def test_reranker(self):
+        """Test that the reranker scores reorder the results."""
+        search_tool = SearchTool(FAISS(HashingEmbeddings()), reranker=lambda query, documents: [len(d.text) for d in documents])
+        documents = [Document(text="the cat sat on the mat", id=1), Document(text="the dog sat on the long log", id=2)]
+        search_tool.add_docs(documents)
+        self.assertEqual(search_tool.run("the cat sat on the mat", top_k=2), documents[::-1])
+
+    def test_reranker_mmr(self):
+        """Test that MMR uses the reranker scores as relevance."""
+        documents = [
+            Document(text="the cat sat on the mat", id=1),
+            Document(text="the cat sat on the mat!", id=2),
+            Document(text="quantum chromodynamics", id=3),
+        ]
+        scores = {1: 0.0, 2: 0.5, 3: 1.0}
+        reranker = lambda query, documents: [scores[d.id] for d in documents]
+        search_tool = SearchTool(FAISS(HashingEmbeddings()), reranker=reranker, mmr_lambda=1.0)
+        search_tool.add_docs(documents)
+        self.assertEqual(search_tool.run("the cat sat on the mat", top_k=2), [documents[2], documents[1]])
+        search_tool.mmr_lambda = 0.5
+        self.assertEqual(search_tool.run("the cat sat on the mat", top_k=2), [documents[2], documents[1]])
+
+    def test_mmr_loaded_index(self):
+        """Test MMR on a FAISS store built from an existing index."""
+        embeddings = HashingEmbeddings()
+        store = FAISS(embeddings)
+        documents = [Document(text="the cat sat on the mat", id=1), Document(text="a cat chased the dog", id=2)]
+        store.add(documents)
+        loaded = FAISS(embeddings, index=store.index, documents=documents)
+        search_tool = SearchTool(loaded, mmr_lambda=0.5)
+        self.assertEqual(search_tool.run("the cat sat on the mat", top_k=2), documents)
+
+    def test_empty_store(self):
+        """Test searching a store without documents."""
+        self.assertEqual(SearchTool(FAISS(HashingEmbeddings())).run("test"), [])
+        self.assertEqual(SearchTool(FAISS(HashingEmbeddings()), mmr_lambda=0.5).run("test"), [])
+
+    def test_token_budget(self):
+        """Test that only documents that fit in the token budget are returned."""
+        search_tool = SearchTool(FAISS(HashingEmbeddings()), token_budget=5)
+        short = Document(text="the cat sat", id=1)
+        long = Document(text="the cat sat on the mat today", id=2)
+        search_tool.add_docs([short, long])
+        self.assertEqual(search_tool.run("the cat sat on the mat today", top_k=2), [short])
+
+
+class TestMaximalMarginalRelevance(unittest.TestCase):
+
+    def test_selection(self):
+        """Test that MMR trades relevance for diversity."""
+        query = np.array([1.0, 0.0], dtype=np.float32)
+        embeddings = np.array([[1.0, 0.0], [0.99, 0.01], [0.7, 0.7]], dtype=np.float32)
+        self.assertEqual(maximal_marginal_relevance(query, embeddings, 2, lambda_mult=1.0), [0, 1])
+        self.assertEqual(maximal_marginal_relevance(query, embeddings, 2, lambda_mult=0.3), [0, 2])
+        self.assertEqual(maximal_marginal_relevance(query, embeddings[:0], 2), [])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
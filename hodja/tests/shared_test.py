@@ -0,0 +1,126 @@
+"""Unit tests for shared.py"""
+
+import multiprocessing
+import unittest
+
+import numpy as np
+from hodja.search import shared
+from hodja.search import docstores
+from hodja.search.documents import Document
+from hodja.search.embeddings.local import HashingEmbeddings
+from hodja.search.shared import SharedDocStore, SharedDocStorePublisher
+from hodja.tools.search_tools import SearchTool
+
+
+def search_in_worker(name, query, queue):
+    docstore = SharedDocStore(name, HashingEmbeddings(dimension=64))
+    queue.put([document.text for document in docstore.search(query, 1)])
+    docstore.close()
+
+
+class TestSharedDocStore(unittest.TestCase):
+
+    def setUp(self):
+        self.embeddings = HashingEmbeddings(dimension=64)
+        self.store = docstores.FAISS(self.embeddings)
+        self.documents = [
+            Document(text="the cat sat on the mat", id=1, source="a"),
+            Document(text="the dog sat on the log", id=2),
+            Document(text="ünïcödé text", id=3),
+        ]
+        self.store.add(self.documents)
+        self.publisher = SharedDocStorePublisher(self.store)
+        self.docstore = SharedDocStore(self.publisher.name, self.embeddings)
+
+    def tearDown(self):
+        self.docstore.close()
+        self.publisher.close()
+
+    def test_get(self):
+        """Test the get and get_all methods."""
+        self.assertEqual(len(self.docstore), 3)
+        self.assertEqual(self.docstore.get(1), self.documents[0])
+        self.assertEqual(self.docstore.get_all(), self.documents)
+
+    def test_search(self):
+        """Test that search matches the published FAISS store."""
+        self.assertEqual(self.docstore.search("the dog sat on the log", 2), self.store.search("the dog sat on the log", 2))
+        self.assertEqual(self.docstore.search("the dog sat on the log", 10), self.store.search("the dog sat on the log", 10))
+
+    def test_search_tool(self):
+        """Test that a SearchTool can wrap the shared docstore."""
+        search_tool = SearchTool(self.docstore, mmr_lambda=0.5)
+        self.assertEqual(search_tool.run("the cat sat on the mat", top_k=1), [self.documents[0]])
+
+    def test_read_only(self):
+        """Test that the shared docstore cannot be modified."""
+        with self.assertRaises(TypeError):
+            self.docstore.add([Document(text="new", id=4)])
+        with self.assertRaises(ValueError):
+            self.docstore.document_embeddings[0, 0] = 1.0
+
+    def test_publish(self):
+        """Test that readers pick up a newly published snapshot."""
+        embeddings = self.docstore.document_embeddings
+        expected = self.store.document_embeddings.copy()
+        documents = self.docstore.documents
+        self.store.remove([1])
+        self.publisher.publish(self.store)
+        self.assertEqual(self.docstore.get_all(), self.documents[1:])
+        # views and documents of the old snapshot stay valid
+        np.testing.assert_array_equal(embeddings, expected)
+        np.testing.assert_array_equal(embeddings[1:], expected[1:])
+        self.assertEqual(list(documents), self.documents)
+        # and are unmapped once they are released
+        del embeddings, documents
+        shared._unmap_unused()
+        self.assertEqual(shared._pending_unmaps, [])
+
+    def test_search_tool_swap(self):
+        """Test that a SearchTool run is not affected by a snapshot published mid-run."""
+        def reranker(query, documents):
+            self.store.remove([1, 2])
+            self.publisher.publish(self.store)
+            self.assertEqual(len(self.docstore), 1)
+            return [1.0] * len(documents)
+
+        search_tool = SearchTool(self.docstore, reranker=reranker, mmr_lambda=0.5)
+        self.assertEqual(search_tool.run("the cat sat on the mat", top_k=3), self.documents)
+
+    def test_existing_index(self):
+        """Test publishing a FAISS store built from an existing index."""
+        store = docstores.FAISS(self.embeddings, index=self.store.index, documents=self.documents)
+        with SharedDocStorePublisher(store) as publisher:
+            docstore = SharedDocStore(publisher.name, self.embeddings)
+            self.assertEqual(len(docstore), 3)
+            self.assertEqual(docstore.get(3), self.documents[2])
+            self.assertEqual(docstore.get_all(), self.documents)
+            self.assertEqual(docstore.search("the dog sat on the log", 2), self.store.search("the dog sat on the log", 2))
+            docstore.close()
+
+    def test_docstore(self):
+        """Test publishing a plain DocStore."""
+        store = docstores.DocStore()
+        store.add(self.documents)
+        with SharedDocStorePublisher(store) as publisher:
+            docstore = SharedDocStore(publisher.name)
+            self.assertEqual(docstore.get(2), self.documents[1])
+            docstore.close()
+
+    def test_worker_process(self):
+        """Test searching from another process."""
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        worker = context.Process(target=search_in_worker, args=(self.publisher.name, "ünïcödé text", queue))
+        worker.start()
+        self.assertEqual(queue.get(timeout=60), ["ünïcödé text"])
+        worker.join()
+        self.assertEqual(worker.exitcode, 0)
+        # the worker exiting must not remove the shared memory
+        docstore = SharedDocStore(self.publisher.name)
+        self.assertEqual(len(docstore), 3)
+        docstore.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Tools that wrap Chains so Agents can use the functionality of other Chains."""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from hodja.tools.base import Tool
+
+
+class _ResultCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, max_size=128, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (True, value) if key is cached and fresh, otherwise (False, None)."""
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            value, expires = self._entries[key]
+            if expires is not None and time.monotonic() >= expires:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ChainTool(Tool):
+    """Tool that runs a Chain on its input and returns the Chain's output.
+
+    Each call runs the Chain on a fresh copy of its initial state, so calls do not see each
+    other's state. Outputs are cached by input, and the number of sub-chain executions
+    running at the same time can be limited to protect API quotas. The limit counts top-level
+    calls per thread: a Chain that calls this tool again from inside itself reuses its
+    thread's slot instead of waiting for a new one, so recursion cannot deadlock.
+    """
+
+    def __init__(self, chain, name=None, description=None, instructions="Provide input as text.", cache_size=128, ttl=None, max_concurrency=None):
+        """Initialize ChainTool.
+
+        Args:
+            chain: Chain to wrap.
+            name: Name of the tool. Defaults to the name of the chain.
+            description: Description of what the chain does.
+            cache_size: Maximum number of outputs to cache. Set to 0 to disable caching.
+            ttl: Number of seconds a cached output stays valid. None means forever.
+            max_concurrency: Maximum number of chain executions running at once. None means no limit.
+        """
+        name = name or chain.name
+        description = description or f"Runs the {chain.name} chain on the input and returns its output."
+        super().__init__(name, description, instructions)
+        self.chain = chain
+        self.cache = _ResultCache(max_size=cache_size, ttl=ttl) if cache_size else None
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._local = threading.local()
+
+    def run(self, input, debug=False):
+        """Run the chain on the input.
+
+        Args:
+            input: Input to the chain.
+
+        Returns:
+            The output of the chain.
+        """
+        if self.cache is not None:
+            hit, output = self.cache.get(input)
+            if hit:
+                return output
+        if self._semaphore is None or getattr(self._local, "depth", 0):
+            output = self._run_chain(input, debug)
+        else:
+            with self._semaphore:
+                output = self._run_chain(input, debug)
+        if self.cache is not None:
+            self.cache.set(input, output)
+        return output
+
+    def _run_chain(self, input, debug):
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        try:
+            state = copy.deepcopy(self.chain.initial_state)
+            return self.chain.run_state(input, state, debug=debug)["output"]
+        finally:
+            self._local.depth = depth
@@ -1,42 +1,185 @@
 """Tools for math."""
 
+import ast
+import operator
+from functools import lru_cache
 from hodja.tools.base import Tool
 
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
 class MathTool(Tool):
-    """Example tool that evaluates simple math expressions."""
+    """Example tool that evaluates simple math expressions.
+
+    Expressions are parsed into an AST, checked against a whitelist of number literals and
+    arithmetic operators, and compiled into nested closures that are cached by expression
+    string. Integer operands and results are limited to max_bits bits and expressions to
+    max_operations operators, so inputs cannot tie up the process with huge computations.
+    """
 
-    def __init__(self, name="Math", description="Evaluate a math expression. Note: only numbers and basic operators (e.g. +-*/) are allowed.", instructions="Enter a math expression."):
+    def __init__(self, name="Math", description="Evaluate a math expression. Note: only numbers, parentheses and basic operators (e.g. +-*/) are allowed. Separate several expressions with semicolons (;) to evaluate them all at once.", instructions="Enter a math expression.", max_bits=4096, max_operations=100, max_length=1000, cache_size=256):
+        """Initialize MathTool.
+
+        Args:
+            max_bits: Largest allowed size, in bits, of integer operands and results.
+            max_operations: Largest allowed number of operators in an expression.
+            max_length: Largest allowed length of an expression string.
+            cache_size: Number of compiled expressions to keep in the LRU cache.
+        """
         super().__init__(name=name, description=description, instructions=instructions)
+        self.max_bits = max_bits
+        self.max_operations = max_operations
+        self.max_length = max_length
+        self._cached_compile = lru_cache(maxsize=cache_size)(self._compile)
+
+    def _check_size(self, value):
+        if isinstance(value, int) and value.bit_length() > self.max_bits:
+            raise ValueError(f"Invalid input. Numbers may not be larger than {self.max_bits} bits.")
+        return value
+
+    def _apply(self, op, left, right):
+        """Apply a binary operator, refusing to start computations whose results would be too large."""
+        if isinstance(left, int) and isinstance(right, int):
+            too_large = (
+                (op is ast.Mult and left.bit_length() + right.bit_length() > self.max_bits + 1)
+                or (op is ast.Pow and right > 0 and abs(left) > 1 and (left.bit_length() - 1) * right > self.max_bits)
+            )
+            if too_large:
+                raise ValueError(f"Invalid input. Numbers may not be larger than {self.max_bits} bits.")
+        result = _BINARY_OPERATORS[op](left, right)
+        if isinstance(result, complex):
+            raise ValueError("Invalid input. Only expressions with real results are allowed.")
+        return self._check_size(result)
+
+    def _compile_node(self, node):
+        """Turn a whitelisted AST node into a closure that evaluates it."""
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            value = self._check_size(node.value)
+            return lambda: value
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            op = type(node.op)
+            left, right = self._compile_node(node.left), self._compile_node(node.right)
+            return lambda: self._apply(op, left(), right())
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            op = _UNARY_OPERATORS[type(node.op)]
+            operand = self._compile_node(node.operand)
+            return lambda: op(operand())
+        if isinstance(node, ast.Tuple):
+            elements = [self._compile_node(element) for element in node.elts]
+            return lambda: tuple(element() for element in elements)
+        raise ValueError("Invalid input. Only numbers, parentheses, commas (,), and math operators (+-*/%) are allowed.")
+
+    def _compile(self, expression):
+        """Parse and compile an expression into a function that evaluates it."""
+        if len(expression) > self.max_length:
+            raise ValueError(f"Invalid input. Expressions may not be longer than {self.max_length} characters.")
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError:
+            raise ValueError(f"Invalid input. Could not parse {expression!r}.")
+        n_operations = sum(isinstance(node, (ast.BinOp, ast.UnaryOp)) for node in ast.walk(tree))
+        if n_operations > self.max_operations:
+            raise ValueError(f"Invalid input. Expressions may not have more than {self.max_operations} operations.")
+        return self._compile_node(tree.body)
+
+    def evaluate(self, expression):
+        """Evaluate a single math expression."""
+        function = self._cached_compile(expression)
+        try:
+            return function()
+        except ArithmeticError as e:
+            raise ValueError(f"Could not evaluate {expression!r}: {e}.")
 
     def run(self, input):
-        # check if input is a math expression (e.g. numbers and math operators only)
-        # if not, raise an error
-        allowed_characters = "0123456789+-*/.,"
-        for character in input:
-            if character not in allowed_characters:
-                raise ValueError("Invalid input. Only numbers, decimals (.), commas (,), and math operators (+-*/) are allowed.")
-        # evaluate the math expression
-        return eval(input)
+        """Evaluate one math expression, or several separated by semicolons.
+
+        Returns:
+            The value of the expression, or a list of values if several were given.
+        """
+        if ";" not in input:
+            return self.evaluate(input)
+        expressions = input.split(";")
+        # allow a trailing semicolon
+        if not expressions[-1].strip():
+            expressions.pop()
+        return self.run_batch(expressions)
+
+    def run_batch(self, expressions):
+        """Evaluate many math expressions.
+
+        Returns:
+            List of values in the same order as expressions.
+        """
+        for i, expression in enumerate(expressions):
+            if not expression.strip():
+                raise ValueError(f"Invalid input. Expression {i} is empty.")
+        return [self.evaluate(expression) for expression in expressions]
+
+
+def fibonacci(n):
+    """Return the nth Fibonacci number (F(0) = 0, F(1) = 1) in O(log n) steps by fast doubling."""
+    if n < 0:
+        raise ValueError("n must be non-negative.")
+    a, b = 0, 1  # F(k), F(k+1) for k = the bits of n read so far
+    for bit in bin(n)[2:]:
+        # F(2k) = F(k) * (2F(k+1) - F(k)), F(2k+1) = F(k)^2 + F(k+1)^2
+        a, b = a * (2 * b - a), a * a + b * b
+        if bit == "1":
+            a, b = b, a + b
+    return a
 
 
 class FibonacciTool(Tool):
     """Example tool that returns the nth Fibonacci number."""
 
-    def __init__(self, name="Fibonacci", description="Returns the nth Fibonacci number", instructions="Enter a number n."):
+    def __init__(self, name="Fibonacci", description="Returns the nth Fibonacci number", instructions="Enter a number n.", max_n=10000, cache_size=128):
+        """Initialize FibonacciTool.
+
+        Args:
+            max_n: Largest n the tool accepts. Note that Python refuses to convert integers
+                with more than 4300 digits (n above about 20000) to strings by default.
+            cache_size: Number of results to keep in the LRU cache.
+        """
         super().__init__(name, description, instructions)
+        self.max_n = max_n
+        self._fib = lru_cache(maxsize=cache_size)(fibonacci)
 
-    def run(self, n):
+    def _parse(self, n):
         # check if input is a number
         # if not, raise an error
         try:
             n = int(n)
-        except:
+        except (TypeError, ValueError):
             raise ValueError("Invalid input. Only numbers are allowed.")
-        
-        def _fib(n):
-            if n <= 1:
-                return n
-            else:
-                return _fib(n-1) + _fib(n-2)
-            
-        return _fib(n+1)
\ No newline at end of file
+        if n < 0 or n > self.max_n:
+            raise ValueError(f"Invalid input. n must be between 0 and {self.max_n}.")
+        return n
+
+    def run(self, n):
+        return self._fib(self._parse(n) + 1)
+
+    def run_batch(self, ns):
+        """Return the Fibonacci numbers for many n at once.
+
+        Args:
+            ns: Iterable of inputs, each as accepted by run.
+
+        Returns:
+            List of results in the same order as ns.
+        """
+        ns = [self._parse(n) for n in ns]
+        # compute each distinct n only once
+        results = {n: self._fib(n + 1) for n in sorted(set(ns))}
+        return [results[n] for n in ns]
@@ -1,17 +1,105 @@
-from hodja.search.docstores import FAISS
 from hodja.tools.base import Tool
 
 
+def count_tokens(text):
+    """Roughly count the tokens in a text by counting whitespace-separated words."""
+    return len(text.split())
+
+
+def maximal_marginal_relevance(query_embedding, embeddings, k, lambda_mult=0.5, relevance=None):
+    """Select embeddings that are relevant to the query but not redundant with each other.
+
+    Args:
+        query_embedding: Query embedding of shape (dim,).
+        embeddings: Candidate embeddings of shape (n, dim).
+        k: Number of candidates to select.
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0).
+        relevance: Optional relevance scores of the candidates (higher is better), e.g. from a
+            reranker. They are rescaled to [0, 1] and used instead of the cosine similarity
+            to the query.
+
+    Returns:
+        List of selected candidate positions, in selection order.
+    """
+    import numpy as np
+    k = min(k, len(embeddings))
+    if k <= 0:
+        return []
+    # cosine similarities of the candidates to the query and to each other
+    norms = np.linalg.norm(embeddings, axis=1)
+    norms[norms == 0] = 1.0
+    candidates = embeddings / norms[:, None]
+    if relevance is None:
+        query_norm = np.linalg.norm(query_embedding) or 1.0
+        query_similarity = candidates @ (query_embedding / query_norm)
+    else:
+        relevance = np.asarray(relevance, dtype=np.float64)
+        spread = relevance.max() - relevance.min()
+        query_similarity = (relevance - relevance.min()) / spread if spread > 0 else np.ones(len(relevance))
+    pairwise_similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(query_similarity))]
+    redundancy = pairwise_similarity[selected[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < k:
+        scores = lambda_mult * query_similarity - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, pairwise_similarity[best], out=redundancy)
+    return selected
+
+
 class SearchTool(Tool):
-    """Tool for wrapping a DocStore so an Agent can search for relevant documents."""
+    """Tool for wrapping a DocStore so an Agent can search for relevant documents.
+
+    Results can optionally be post-processed before they are returned to the Agent:
+        1. Candidates farther than max_distance from the query are dropped.
+        2. A reranker scores the remaining candidates, which are reordered by score.
+        3. Maximal Marginal Relevance removes near-duplicate passages, using the reranker
+           scores as relevance when there is a reranker.
+        4. The highest-ranked passages that fit in token_budget are kept.
+    Post-processing needs a docstore with search_candidates, such as FAISS or SharedDocStore.
+    """
     def __init__(
         self,
         docstore,
-        name="Search", 
-        description="Search for documents based on a query. Returns a list of documents that best match the query.", 
-        instructions="Provide query as text."):
+        name="Search",
+        description="Search for documents based on a query. Returns a list of documents that best match the query.",
+        instructions="Provide query as text.",
+        max_distance=None,
+        reranker=None,
+        mmr_lambda=None,
+        fetch_k=20,
+        token_budget=None,
+        token_counter=count_tokens):
+        """Initialize SearchTool.
+
+        Args:
+            docstore: DocStore to search.
+            max_distance: Drop documents whose (not squared) L2 distance to the query is larger than this.
+            reranker: Callable taking (query, documents) and returning one relevance score per
+                document (higher is better).
+            mmr_lambda: If set, diversify results with Maximal Marginal Relevance using this
+                relevance/diversity trade-off (1.0 is pure relevance).
+            fetch_k: Number of candidates to retrieve before post-processing.
+            token_budget: Maximum total number of tokens in the returned documents.
+            token_counter: Callable that counts the tokens in a text.
+        """
         super().__init__(name, description, instructions)
         self.docstore = docstore
+        self.max_distance = max_distance
+        self.reranker = reranker
+        self.mmr_lambda = mmr_lambda
+        self.fetch_k = fetch_k
+        self.token_budget = token_budget
+        self.token_counter = token_counter
+
+    @property
+    def _post_processing(self):
+        return any(option is not None for option in (self.max_distance, self.reranker, self.mmr_lambda, self.token_budget))
 
     def run(self, query, top_k=3):
         """Search for documents similar to a query.
@@ -23,12 +111,55 @@ class SearchTool(Tool):
         Returns:
             List of top documents.
         """
-        results = self.docstore.search(query, min(top_k, len(self.docstore)))
-        return results
+        if not self._post_processing:
+            return self.docstore.search(query, top_k)
+
+        # one call, so everything comes from the same snapshot of a shared docstore
+        query_embedding = self.docstore.embed_query(query)
+        distances, documents, embeddings = self.docstore.search_candidates(query_embedding, max(self.fetch_k, top_k))
+        if self.max_distance is not None:
+            # the docstore returns squared L2 distances
+            keep = distances <= self.max_distance ** 2
+            documents = [document for document, kept in zip(documents, keep) if kept]
+            embeddings = embeddings[keep]
+
+        scores = None
+        if self.reranker is not None:
+            import numpy as np
+            scores = np.asarray(self.reranker(query, documents), dtype=np.float64)
+            if scores.shape != (len(documents),):
+                raise ValueError(f"Reranker returned {scores.shape} scores for {len(documents)} documents.")
+            order = np.argsort(-scores, kind="stable")
+            documents = [documents[i] for i in order]
+            embeddings, scores = embeddings[order], scores[order]
+
+        if self.mmr_lambda is not None:
+            selected = maximal_marginal_relevance(
+                query_embedding, embeddings, top_k, self.mmr_lambda, relevance=scores
+            )
+            # keep the ranking order of the selected documents
+            documents = [documents[i] for i in sorted(selected)]
+        else:
+            documents = documents[:top_k]
+
+        if self.token_budget is not None:
+            documents = self._pack(documents)
+        return documents
+
+    def _pack(self, documents):
+        """Keep the highest-ranked documents that fit in the token budget."""
+        packed = []
+        remaining = self.token_budget
+        for document in documents:
+            n_tokens = self.token_counter(document.text)
+            if n_tokens <= remaining:
+                packed.append(document)
+                remaining -= n_tokens
+        return packed
 
     def add_docs(self, docs):
         """Add documents to the docstore."""
         self.docstore.add(docs)
-            
+
 
 